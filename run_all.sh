@@ -2,6 +2,7 @@
 
 # Exit immediately if a command exits with a non-zero status
 set -e
+set -o pipefail
 
 # Log file
 LOG_DIR="logs"
@@ -31,30 +32,24 @@ fi
 echo "Activating virtual environment..." | tee -a "$LOG_FILE"
 source .venv/bin/activate
 
-# Install requirements
+# Install requirements (only when requirements.txt changed since last install)
+REQ_HASH_FILE=".venv/.requirements.sha256"
 if [ -f "requirements.txt" ]; then
-    echo "Installing packages from requirements.txt..." | tee -a "$LOG_FILE"
-    while IFS= read -r package || [[ -n "$package" ]]; do
-        if [[ -n "$package" ]]; then
-            echo "Installing $package..." | tee -a "$LOG_FILE"
-            pip install "$package" | tee -a "$LOG_FILE"
-        fi
-    done < requirements.txt
+    REQ_HASH=$(sha256sum requirements.txt | cut -d' ' -f1)
+    if [ -f "$REQ_HASH_FILE" ] && [ "$(cat "$REQ_HASH_FILE")" == "$REQ_HASH" ]; then
+        echo "requirements.txt unchanged, skipping installation." | tee -a "$LOG_FILE"
+    else
+        echo "Installing packages from requirements.txt..." | tee -a "$LOG_FILE"
+        pip install -r requirements.txt | tee -a "$LOG_FILE"
+        echo "$REQ_HASH" > "$REQ_HASH_FILE"
+    fi
 else
     echo "requirements.txt not found, skipping installation." | tee -a "$LOG_FILE"
 fi
 
-# Run scripts in order
-SCRIPTS=("pre_database.py" "pages_processing.py" "content_processing.py" "post_database.py")
-
-for script in "${SCRIPTS[@]}"; do
-    if [ -f "scripts/$script" ]; then
-        echo "Running $script..." | tee -a "$LOG_FILE"
-        python3 "scripts/$script" >> "$LOG_FILE" 2>&1
-        echo "$script finished." | tee -a "$LOG_FILE"
-    else
-        echo "[WARNING] Script $script not found, skipping." | tee -a "$LOG_FILE"
-    fi
-done
+# Run all stages in a single Python process (logs to $LOG_FILE itself)
+echo "Running run_pipeline.py..." | tee -a "$LOG_FILE"
+python3 scripts/run_pipeline.py
+echo "run_pipeline.py finished." | tee -a "$LOG_FILE"
 
 echo "All tasks completed successfully." | tee -a "$LOG_FILE"
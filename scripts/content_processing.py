@@ -3,15 +3,20 @@ import csv
 import time
 import shutil
 import logging
+from contextlib import nullcontext
 from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
 from bs4 import BeautifulSoup
+import page_readiness
+from html_archive import HtmlArchive
 
 TMP_FRESH_DIR = os.path.join("tmp", "fresh_links")
 TMP_HTML_DIR = os.path.join("tmp", "paper_html")
 CONTENT_DIR = "content_data"
 MAX_THREADS = 20
+browser_slots = None  # run_pipeline.py gán semaphore dùng chung để giới hạn tổng số Chromium
+ARCHIVE_HTML = False  # True: lưu HTML gốc vào archive/html để re-extract không cần crawl lại
 LOG_PATH = os.path.join("logs", "content_processing_log.txt")
 
 os.makedirs(CONTENT_DIR, exist_ok=True)
@@ -28,25 +33,18 @@ logging.basicConfig(
     ]
 )
 
+html_archive = HtmlArchive() if ARCHIVE_HTML else None
+
 def sanitize_filename(name):
     return "".join(c if c.isalnum() or c in ('-', '_') else '_' for c in name.lower())
 
 def fetch_page_html(url, tmp_html_path):
     """Fetch rendered HTML and save to tmp HTML file"""
-    with sync_playwright() as p:
+    with browser_slots or nullcontext(), sync_playwright() as p:
         browser = p.chromium.launch(headless=True)
         page = browser.new_page()
-        page.goto(url, timeout=30000)
-        
-        last_height = 0
-        for _ in range(20):
-            page.evaluate("window.scrollBy(0, 1000);")
-            time.sleep(0.3)
-            current_height = page.evaluate("document.body.scrollHeight")
-            if current_height == last_height:
-                break
-            last_height = current_height
-        time.sleep(0.5)
+        if not page_readiness.goto_and_wait(page, url, "article"):
+            logging.warning(f"Article body not ready within budget for {url}, using current DOM")
         html_content = page.content()
         with open(tmp_html_path, "w", encoding="utf-8") as f:
             f.write(html_content)
@@ -87,9 +85,11 @@ def save_txt_from_html(html_content, output_path, url):
     logging.info(f"Saved text file {file_path}")
     return filename
 
-def crawl_paper(url, tmp_html_path, output_path):
+def crawl_paper(url, tmp_html_path, output_path, category_name=None):
     try:
         html_content = fetch_page_html(url, tmp_html_path)
+        if html_archive is not None:
+            html_archive.store(url, category_name, html_content)
         filename = save_txt_from_html(html_content, output_path, url)
         return True, filename
     except PlaywrightTimeoutError:
@@ -133,11 +133,11 @@ def process_category(csv_file):
     success_count = 0
     fail_count = 0
 
-    with ThreadPoolExecutor(max_workers=MAX_THREADS) as executor:
+    with ThreadPoolExecutor(max_workers=MAX_THREADS, thread_name_prefix="content") as executor:
         futures = {}
         for idx, url in enumerate(links, 1):
             tmp_html_path = os.path.join(tmp_category_dir, f"tmp_{idx}.html")
-            futures[executor.submit(crawl_paper, url, tmp_html_path, output_dir)] = url
+            futures[executor.submit(crawl_paper, url, tmp_html_path, output_dir, category_name)] = url
 
         for future in as_completed(futures):
             try:
@@ -154,6 +154,7 @@ def process_category(csv_file):
 
     elapsed = time.time() - start_time
     logging.info(f"Category '{category_name}' finished. Success: {success_count}, Fail: {fail_count}, Time: {elapsed:.2f}s")
+    page_readiness.stats.log_summary()
 
     if os.path.exists(tmp_category_dir):
         shutil.rmtree(tmp_category_dir)
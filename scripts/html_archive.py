@@ -0,0 +1,132 @@
+import os
+import gzip
+import sqlite3
+import hashlib
+import logging
+import threading
+from datetime import datetime, timezone
+
+# Paths
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ARCHIVE_DIR = os.path.join(BASE_DIR, '../archive/html')
+INDEX_PATH = os.path.join(ARCHIVE_DIR, 'index.db')
+
+SEGMENT_MAX_BYTES = 1024 * 1024 * 1024  # sang segment mới khi vượt 1GB
+
+TABLES = {
+    "records": """
+        CREATE TABLE IF NOT EXISTS records (
+            digest TEXT PRIMARY KEY,
+            segment TEXT NOT NULL,
+            offset INTEGER NOT NULL,
+            length INTEGER NOT NULL
+        )
+    """,
+    "captures": """
+        CREATE TABLE IF NOT EXISTS captures (
+            idx INTEGER PRIMARY KEY AUTOINCREMENT,
+            url TEXT NOT NULL,
+            category TEXT,
+            digest TEXT NOT NULL,
+            fetched_at TEXT NOT NULL
+        )
+    """
+}
+
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_captures_url ON captures (url, category)",
+]
+
+def build_record(url, digest, payload, fetched_at):
+    """WARC-style 'resource' record: header block, blank line, payload"""
+    header = (
+        "WARC/1.0\r\n"
+        "WARC-Type: resource\r\n"
+        f"WARC-Record-ID: <urn:sha256:{digest}>\r\n"
+        f"WARC-Date: {fetched_at}\r\n"
+        f"WARC-Target-URI: {url}\r\n"
+        f"WARC-Payload-Digest: sha256:{digest}\r\n"
+        "Content-Type: text/html; charset=utf-8\r\n"
+        f"Content-Length: {len(payload)}\r\n"
+        "\r\n"
+    )
+    return header.encode("utf-8") + payload + b"\r\n\r\n"
+
+def read_record(segment, offset, length):
+    """Read one archived page back as text; each record is its own gzip member so it can be read by offset"""
+    with open(os.path.join(ARCHIVE_DIR, segment), "rb") as f:
+        f.seek(offset)
+        record = gzip.decompress(f.read(length))
+    header, _, body = record.partition(b"\r\n\r\n")
+    content_length = next(
+        int(line.split(b":", 1)[1]) for line in header.split(b"\r\n") if line.lower().startswith(b"content-length:")
+    )
+    return body[:content_length].decode("utf-8")
+
+class HtmlArchive:
+    """Append-only, gzip-compressed, content-addressed store for fetched HTML (thread-safe)"""
+
+    def __init__(self):
+        os.makedirs(ARCHIVE_DIR, exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(INDEX_PATH, check_same_thread=False)
+        cursor = self.conn.cursor()
+        for create_sql in TABLES.values():
+            cursor.execute(create_sql)
+        for index_sql in INDEXES:
+            cursor.execute(index_sql)
+        self.conn.commit()
+
+    def _current_segment(self):
+        segments = sorted(f for f in os.listdir(ARCHIVE_DIR) if f.endswith(".warc.gz"))
+        if segments and os.path.getsize(os.path.join(ARCHIVE_DIR, segments[-1])) < SEGMENT_MAX_BYTES:
+            return segments[-1]
+        return f"segment-{len(segments):05d}.warc.gz"
+
+    def store(self, url, category, html_content):
+        payload = html_content.encode("utf-8")
+        digest = hashlib.sha256(payload).hexdigest()
+        fetched_at = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+        with self._lock:
+            cursor = self.conn.cursor()
+            cursor.execute("SELECT 1 FROM records WHERE digest = ?", (digest,))
+            if cursor.fetchone() is None:
+                segment = self._current_segment()
+                data = gzip.compress(build_record(url, digest, payload, fetched_at))
+                with open(os.path.join(ARCHIVE_DIR, segment), "ab") as f:
+                    offset = f.tell()
+                    f.write(data)
+                cursor.execute("""
+                    INSERT INTO records (digest, segment, offset, length) VALUES (?, ?, ?, ?)
+                """, (digest, segment, offset, len(data)))
+            cursor.execute("""
+                INSERT INTO captures (url, category, digest, fetched_at) VALUES (?, ?, ?, ?)
+            """, (url, category, digest, fetched_at))
+            self.conn.commit()
+        return digest
+
+    def latest_captures(self, categories=None):
+        """(url, category, segment, offset, length) of the latest capture of each url in each category
+
+        The same article is often crawled under several categories; contents rows are per category,
+        so every (url, category) pair must be re-extracted.
+        """
+        sql = """
+            SELECT c.url, c.category, r.segment, r.offset, r.length
+            FROM captures c
+            JOIN records r ON r.digest = c.digest
+            WHERE c.idx IN (SELECT MAX(idx) FROM captures GROUP BY url, category)
+        """
+        params = []
+        if categories:
+            sql += f" AND c.category IN ({','.join('?' * len(categories))})"
+            params = list(categories)
+        with self._lock:
+            rows = self.conn.execute(sql + " ORDER BY c.category, c.idx", params).fetchall()
+        return rows
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+        logging.info(f"HTML archive index closed: {INDEX_PATH}")
@@ -0,0 +1,220 @@
+import os
+import zlib
+import sqlite3
+import logging
+import numpy as np
+
+# Paths
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_PATH = os.path.join(BASE_DIR, '../database/vneconomy_news.db')
+LOG_PATH = os.path.join(BASE_DIR, '../logs/near_duplicates_log.txt')
+
+# MinHash / LSH parameters
+NUM_PERM = 128
+LSH_BANDS = 16
+LSH_ROWS = NUM_PERM // LSH_BANDS   # ngưỡng LSH ~ (1/16)^(1/8) ≈ 0.71
+SHINGLE_SIZE = 5                   # shingle theo 5 từ liên tiếp
+MIN_TOKENS = 20                    # bài quá ngắn (rỗng, "Content could not be extracted") không so trùng
+SIMILARITY_THRESHOLD = 0.8         # Jaccard ước lượng để coi là trùng
+MERSENNE_PRIME = np.uint64((1 << 31) - 1)
+
+# Hệ số hoán vị cố định để signature lưu trong DB luôn so sánh được giữa các lần chạy
+_rng = np.random.RandomState(20250901)
+PERM_A = _rng.randint(1, int(MERSENNE_PRIME), size=NUM_PERM).astype(np.uint64)[:, None]
+PERM_B = _rng.randint(0, int(MERSENNE_PRIME), size=NUM_PERM).astype(np.uint64)[:, None]
+
+TABLES = {
+    "content_signatures": """
+        CREATE TABLE IF NOT EXISTS content_signatures (
+            content_idx INTEGER PRIMARY KEY,
+            signature BLOB
+        )
+    """,
+    "lsh_buckets": """
+        CREATE TABLE IF NOT EXISTS lsh_buckets (
+            band INTEGER NOT NULL,
+            bucket BLOB NOT NULL,
+            content_idx INTEGER NOT NULL
+        )
+    """,
+    "content_duplicates": """
+        CREATE TABLE IF NOT EXISTS content_duplicates (
+            idx INTEGER PRIMARY KEY AUTOINCREMENT,
+            canonical_idx INTEGER NOT NULL,
+            category_index INTEGER NOT NULL,
+            publish_date TEXT,
+            title TEXT,
+            similarity REAL,
+            UNIQUE(category_index, publish_date, title)
+        )
+    """
+}
+
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_lsh_buckets ON lsh_buckets (band, bucket)",
+    "CREATE INDEX IF NOT EXISTS idx_content_duplicates_canonical ON content_duplicates (canonical_idx)",
+]
+
+def minhash_signature(text):
+    """Compute MinHash signature (uint32 array of NUM_PERM) from word shingles.
+
+    Returns None for texts under MIN_TOKENS words (empty files, "Content could not be extracted"),
+    which are too short to compare and are never treated as duplicates.
+    """
+    tokens = text.lower().split()
+    if len(tokens) < MIN_TOKENS:
+        return None
+    shingles = {" ".join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)}
+
+    hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+    # (NUM_PERM, 1) x (1, n_shingles) -> min theo từng hoán vị
+    permuted = (PERM_A * hashes[None, :] + PERM_B) % MERSENNE_PRIME
+    return permuted.min(axis=1).astype(np.uint32)
+
+class NearDuplicateIndex:
+    """Persistent MinHash/LSH index stored next to the contents table"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.cursor = conn.cursor()
+        for create_sql in TABLES.values():
+            self.cursor.execute(create_sql)
+        for index_sql in INDEXES:
+            self.cursor.execute(index_sql)
+        conn.commit()
+
+    @staticmethod
+    def _bands(signature):
+        return [(band, rows.tobytes()) for band, rows in enumerate(signature.reshape(LSH_BANDS, LSH_ROWS))]
+
+    def find_duplicate(self, signature, before_idx=None):
+        """Return (canonical_idx, similarity) of the closest indexed content, or None.
+
+        With before_idx, only contents with a smaller idx are considered (used when folding existing rows).
+        """
+        candidates = set()
+        for band, bucket in self._bands(signature):
+            self.cursor.execute(
+                "SELECT content_idx FROM lsh_buckets WHERE band = ? AND bucket = ?", (band, bucket)
+            )
+            candidates.update(row[0] for row in self.cursor.fetchall())
+        if before_idx is not None:
+            candidates = {idx for idx in candidates if idx < before_idx}
+        if not candidates:
+            return None
+
+        candidates = sorted(candidates)
+        placeholders = ",".join("?" * len(candidates))
+        self.cursor.execute(
+            f"SELECT content_idx, signature FROM content_signatures WHERE content_idx IN ({placeholders})",
+            candidates
+        )
+        rows = self.cursor.fetchall()
+        if not rows:
+            return None
+
+        ids = np.array([row[0] for row in rows])
+        matrix = np.frombuffer(b"".join(row[1] for row in rows), dtype=np.uint32).reshape(len(rows), NUM_PERM)
+        similarities = (matrix == signature).mean(axis=1)
+        best = int(similarities.argmax())
+        if similarities[best] < SIMILARITY_THRESHOLD:
+            return None
+        return int(ids[best]), float(similarities[best])
+
+    def add(self, content_idx, signature):
+        """Index a content row; signature None only marks the row as checked (too short to compare)"""
+        self.remove(content_idx)
+        self.cursor.execute(
+            "INSERT INTO content_signatures (content_idx, signature) VALUES (?, ?)",
+            (content_idx, signature.tobytes() if signature is not None else None)
+        )
+        if signature is None:
+            return
+        self.cursor.executemany(
+            "INSERT INTO lsh_buckets (band, bucket, content_idx) VALUES (?, ?, ?)",
+            [(band, bucket, content_idx) for band, bucket in self._bands(signature)]
+        )
+
+    def remove(self, content_idx):
+        self.cursor.execute("DELETE FROM lsh_buckets WHERE content_idx = ?", (content_idx,))
+        self.cursor.execute("DELETE FROM content_signatures WHERE content_idx = ?", (content_idx,))
+
+    def add_reference(self, canonical_idx, category_index, publish_date, title, similarity):
+        self.cursor.execute("""
+            INSERT OR IGNORE INTO content_duplicates (canonical_idx, category_index, publish_date, title, similarity)
+            VALUES (?, ?, ?, ?, ?)
+        """, (canonical_idx, category_index, publish_date, title, similarity))
+        return self.cursor.rowcount
+
+    def backfill(self):
+        """Index contents rows not checked yet (incremental, never deletes rows)"""
+        self.cursor.execute("""
+            SELECT c.idx, c.text
+            FROM contents c
+            LEFT JOIN content_signatures s ON s.content_idx = c.idx
+            WHERE s.content_idx IS NULL
+            ORDER BY c.idx
+        """)
+        rows = self.cursor.fetchall()
+        if not rows:
+            return 0
+
+        for content_idx, text in rows:
+            if isinstance(text, bytes):
+                text = text.decode("utf-8", errors="ignore")
+            self.add(content_idx, minhash_signature(text or ""))
+        self.conn.commit()
+        logging.info(f"Near-duplicate backfill: {len(rows)} contents checked")
+        return len(rows)
+
+    def fold_existing(self):
+        """Fold near-duplicate rows already in contents into content_duplicates (deletes them from contents)"""
+        self.cursor.execute("""
+            SELECT s.content_idx, s.signature, c.category_index, c.publish_date, c.title
+            FROM content_signatures s
+            JOIN contents c ON c.idx = s.content_idx
+            WHERE s.signature IS NOT NULL
+            ORDER BY s.content_idx
+        """)
+        rows = self.cursor.fetchall()
+
+        folded = 0
+        for content_idx, signature, category_index, publish_date, title in rows:
+            match = self.find_duplicate(np.frombuffer(signature, dtype=np.uint32), before_idx=content_idx)
+            if not match:
+                continue
+            canonical_idx, similarity = match
+            self.add_reference(canonical_idx, category_index, publish_date, title, similarity)
+            self.cursor.execute("DELETE FROM contents WHERE idx = ?", (content_idx,))
+            self.remove(content_idx)
+            folded += 1
+            logging.info(f"Deleted content {content_idx} as near-duplicate of {canonical_idx} ({similarity:.2f})")
+        self.conn.commit()
+        logging.info(f"Near-duplicate fold: {folded} contents folded into duplicates")
+        return folded
+
+def main():
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler(LOG_PATH, mode='a', encoding='utf-8'),
+            logging.StreamHandler()
+        ]
+    )
+
+    if not os.path.exists(DB_PATH):
+        logging.error(f"Database not found: {DB_PATH}")
+        return
+
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        dedup_index = NearDuplicateIndex(conn)
+        dedup_index.backfill()
+        dedup_index.fold_existing()
+    finally:
+        conn.close()
+        logging.info("Database connection closed.")
+
+if __name__ == "__main__":
+    main()
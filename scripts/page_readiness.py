@@ -0,0 +1,131 @@
+import time
+import logging
+import threading
+from collections import deque
+from playwright.sync_api import Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
+
+# Selector báo hiệu nội dung cần thiết đã có trong DOM, theo loại trang
+READY_SELECTORS = {
+    "article": "div[data-field='body']",
+    "listing": "a.link-layer-imt",
+}
+
+# Vùng theo dõi DOM ổn định: bài viết -> khối cha của body; danh sách -> cả trang
+# (cha của a.link-layer-imt chỉ là một thẻ bài, không phải cả danh sách)
+WATCH_PARENT = {
+    "article": True,
+    "listing": False,
+}
+
+DEFAULT_BUDGET_MS = 10000     # dùng khi chưa đủ mẫu thống kê
+MIN_BUDGET_MS = 2000
+MAX_BUDGET_MS = 30000
+BUDGET_FACTOR = 2.0           # budget = p95 (chỉ lần chờ thành công) * factor
+TIMEOUT_RATE_LIMIT = 0.2      # tỉ lệ timeout gần đây vượt ngưỡng -> nới budget thêm một bậc
+TIMEOUT_STEP = 1.5            # bậc nới, không cộng dồn (trang không bao giờ có selector không đẩy budget lên mãi)
+MIN_SAMPLES = 20
+MAX_SAMPLES = 500
+QUIET_MS = 300                # DOM không đổi trong 300ms -> coi là ổn định
+MAX_QUIESCENCE_MS = 2000
+
+# Chờ vùng chứa selector ngừng thay đổi (MutationObserver), tối đa maxMs
+QUIESCENCE_JS = """([selector, watchParent, quietMs, maxMs]) => new Promise(resolve => {
+    const el = document.querySelector(selector);
+    const target = (watchParent && el && el.parentElement) || document.body;
+    let timer = null;
+    let hardStop = null;
+    const observer = new MutationObserver(() => {
+        clearTimeout(timer);
+        timer = setTimeout(done, quietMs);
+    });
+    function done() {
+        observer.disconnect();
+        clearTimeout(timer);
+        clearTimeout(hardStop);
+        resolve();
+    }
+    observer.observe(target, {childList: true, subtree: true, characterData: true});
+    timer = setTimeout(done, quietMs);
+    hardStop = setTimeout(done, maxMs);
+})"""
+
+class ReadinessStats:
+    """Thread-safe readiness timings per page type; timeout budgets are derived from them"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples = {}
+        self._outcomes = {}
+        self._timeouts = {}
+
+    def budget_ms(self, page_type):
+        """p95 of successful waits * BUDGET_FACTOR, one TIMEOUT_STEP higher while recent timeouts are frequent"""
+        with self._lock:
+            samples = sorted(self._samples.get(page_type, ()))
+            outcomes = list(self._outcomes.get(page_type, ()))
+        if len(samples) < MIN_SAMPLES:
+            return DEFAULT_BUDGET_MS
+        budget = samples[int(0.95 * (len(samples) - 1))] * BUDGET_FACTOR
+        if outcomes and sum(outcomes) / len(outcomes) > TIMEOUT_RATE_LIMIT:
+            budget *= TIMEOUT_STEP
+        return int(min(MAX_BUDGET_MS, max(MIN_BUDGET_MS, budget)))
+
+    def record(self, page_type, elapsed_ms, timed_out):
+        """Timeouts stay out of the percentile (never-ready pages must not inflate it); only the rate is tracked"""
+        with self._lock:
+            self._outcomes.setdefault(page_type, deque(maxlen=MAX_SAMPLES)).append(timed_out)
+            if timed_out:
+                self._timeouts[page_type] = self._timeouts.get(page_type, 0) + 1
+            else:
+                self._samples.setdefault(page_type, deque(maxlen=MAX_SAMPLES)).append(elapsed_ms)
+
+    def log_summary(self):
+        with self._lock:
+            page_types = sorted(set(self._samples) | set(self._timeouts))
+            snapshot = {t: (sorted(self._samples.get(t, ())), self._timeouts.get(t, 0)) for t in page_types}
+        for page_type, (samples, timeouts) in snapshot.items():
+            if samples:
+                p50 = samples[len(samples) // 2]
+                p95 = samples[int(0.95 * (len(samples) - 1))]
+                logging.info(
+                    f"[readiness:{page_type}] samples {len(samples)}, timeouts {timeouts}, "
+                    f"p50 {p50:.0f}ms, p95 {p95:.0f}ms, budget {self.budget_ms(page_type)}ms"
+                )
+            else:
+                logging.info(f"[readiness:{page_type}] samples 0, timeouts {timeouts}")
+
+stats = ReadinessStats()
+
+def goto_and_wait(page, url, page_type, goto_timeout=30000):
+    """Navigate to url and wait until the page type's content is present and the DOM around it settles.
+
+    Returns False if the readiness budget ran out; the page is still usable (caller decides).
+    Navigation errors/timeouts are raised as before.
+    """
+    selector = READY_SELECTORS[page_type]
+    budget = stats.budget_ms(page_type)
+
+    page.goto(url, wait_until="domcontentloaded", timeout=goto_timeout)
+    start = time.perf_counter()
+    try:
+        page.wait_for_selector(selector, state="attached", timeout=budget)
+        timed_out = False
+    except PlaywrightTimeoutError:
+        timed_out = True
+
+    if not timed_out:
+        remaining = budget - (time.perf_counter() - start) * 1000
+        try:
+            page.evaluate(
+                QUIESCENCE_JS,
+                [selector, WATCH_PARENT[page_type], QUIET_MS, max(0, min(MAX_QUIESCENCE_MS, remaining))]
+            )
+        except PlaywrightError as e:
+            # Redirect/re-navigation sau domcontentloaded: selector đã có, bỏ qua bước chờ DOM ổn định
+            logging.debug(f"[readiness:{page_type}] settle skipped for {url}: {e}")
+
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    stats.record(page_type, elapsed_ms, timed_out)
+    if timed_out:
+        logging.debug(f"[readiness:{page_type}] '{selector}' not ready after {elapsed_ms:.0f}ms: {url}")
+    return not timed_out
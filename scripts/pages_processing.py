@@ -2,9 +2,11 @@ import csv
 import os
 import shutil
 import logging
+from contextlib import nullcontext
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
 from bs4 import BeautifulSoup
+import page_readiness
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 TMP_DIR = os.path.join(BASE_DIR, '../tmp')
@@ -29,6 +31,7 @@ logging.basicConfig(
 BASE_URL = "https://vneconomy.vn"
 MAX_PAGES = 200
 MAX_THREADS = 20
+browser_slots = None  # run_pipeline.py gán semaphore dùng chung để giới hạn tổng số Chromium
 MAX_EMPTY_STREAK = 5  # dừng nếu 5 page liên tiếp không link mới
 
 def sanitize_filename(name):
@@ -68,6 +71,7 @@ def save_fresh_links(category_name, links, category_index, start_index=0):
         for i, link in enumerate(sorted(links), start=start_index + 1):
             writer.writerow([i, category_index, link])
     logging.info(f"[{category_name}] {len(links)} new links saved to {file_path}")
+    return file_path
 
 def crawl_category(category_url, category_index):
     category_name = category_url.rstrip("/").split("/")[-1].replace(".htm", "").replace(".html", "")
@@ -77,15 +81,14 @@ def crawl_category(category_url, category_index):
     all_links = set()
     empty_streak = 0
 
-    with sync_playwright() as p:
+    with browser_slots or nullcontext(), sync_playwright() as p:
         browser = p.chromium.launch(headless=True)
         page = browser.new_page()
 
         for page_num in range(1, MAX_PAGES + 1):
             url = f"{category_url}?page={page_num}"
             try:
-                page.goto(url, timeout=30000)
-                page.wait_for_load_state("networkidle")
+                page_readiness.goto_and_wait(page, url, "listing")
                 html_content = page.content()
                 links = extract_links_from_html(html_content)
                 new_links = links - existing_links - all_links
@@ -110,33 +113,41 @@ def crawl_category(category_url, category_index):
         browser.close()
 
     if all_links:
-        save_fresh_links(category_name, all_links, category_index, start_index=last_index)
-    else:
-        logging.info(f"[{category_name}] No new links found.")
+        return save_fresh_links(category_name, all_links, category_index, start_index=last_index)
+    logging.info(f"[{category_name}] No new links found.")
+    return None
 
-def main():
+def load_categories():
     categories_csv = os.path.join(TMP_DIR, 'categories.csv')
+    with open(categories_csv, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+def main(category_rows=None, on_category_done=None):
+    """Crawl all categories; on_category_done(csv_file) is called as each fresh links CSV is written"""
+    if category_rows is None:
+        category_rows = load_categories()
     categories = []
     category_index_map = {}
 
-    with open(categories_csv, newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            url = row['category_link'].strip()
-            idx = int(row['index'])
-            categories.append(url)
-            category_index_map[url] = idx
+    for row in category_rows:
+        url = row['category_link'].strip()
+        idx = int(row['index'])
+        categories.append(url)
+        category_index_map[url] = idx
 
     logging.info(f"Start crawling {len(categories)} categories with {MAX_THREADS} threads")
 
-    with ThreadPoolExecutor(max_workers=MAX_THREADS) as executor:
+    with ThreadPoolExecutor(max_workers=MAX_THREADS, thread_name_prefix="pages") as executor:
         futures = {executor.submit(crawl_category, url, category_index_map[url]): url for url in categories}
         for future in as_completed(futures):
             try:
-                future.result()
+                fresh_path = future.result()
+                if fresh_path and on_category_done:
+                    on_category_done(os.path.basename(fresh_path))
             except Exception as e:
                 logging.error(f"Error in thread for {futures[future]}: {e}")
 
+    page_readiness.stats.log_summary()
     logging.info("Crawling all categories completed.")
 
 if __name__ == "__main__":
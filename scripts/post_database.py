@@ -4,6 +4,7 @@ import re
 import sqlite3
 import shutil
 import logging
+from near_duplicates import NearDuplicateIndex, minhash_signature
 
 TMP_FRESH_DIR = os.path.join("tmp", "fresh_links")
 CONTENT_DIR = "content_data"
@@ -11,6 +12,9 @@ PAPER_LINKS_DIR = "paper_links"
 CATEGORIES_CSV = os.path.join("tmp", "categories.csv")
 DB_PATH = os.path.join("database", "vneconomy_news.db")
 LOG_PATH = os.path.join("logs", "post_database_log.txt")
+EXTRACTION_FALLBACK_TEXT = "Content could not be extracted"
+FRESH_PREFIX = "fresh_"          # content_processing.py
+REEXTRACT_PREFIX = "reextract_"  # reextract_html.py
 
 # Setup logging
 os.makedirs("logs", exist_ok=True)
@@ -23,24 +27,28 @@ logging.basicConfig(
     ]
 )
 
-def load_category_index():
+def load_category_index(category_rows=None):
     mapping = {}
-    if not os.path.exists(CATEGORIES_CSV):
-        logging.error(f"Categories CSV '{CATEGORIES_CSV}' not found")
-        return mapping
-    with open(CATEGORIES_CSV, newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for idx, row in enumerate(reader, 1):
-            if 'category_link' not in row:
-                continue
-            link = row['category_link'].strip()
-            if not link:
-                continue
-            category_name = link.rstrip("/").split("/")[-1].replace(".htm", "").replace(".html", "")
-            mapping[category_name] = idx
+    if category_rows is None:
+        if not os.path.exists(CATEGORIES_CSV):
+            logging.error(f"Categories CSV '{CATEGORIES_CSV}' not found")
+            return mapping
+        with open(CATEGORIES_CSV, newline="", encoding="utf-8") as f:
+            category_rows = list(csv.DictReader(f))
+    for idx, row in enumerate(category_rows, 1):
+        if 'category_link' not in row:
+            continue
+        link = row['category_link'].strip()
+        if not link:
+            continue
+        category_name = link.rstrip("/").split("/")[-1].replace(".htm", "").replace(".html", "")
+        mapping[category_name] = idx
     logging.info(f"Loaded {len(mapping)} categories from CSV")
     return mapping
 
+def is_missing_text(text):
+    return not text or not text.strip() or text.strip() == EXTRACTION_FALLBACK_TEXT
+
 def append_to_paper_links(category_name, fresh_rows):
     os.makedirs(PAPER_LINKS_DIR, exist_ok=True)
     target_file = os.path.join(PAPER_LINKS_DIR, f"{category_name}.csv")
@@ -125,11 +133,21 @@ def import_contents(conn, category_map):
     """)
     conn.commit()
 
+    dedup_index = NearDuplicateIndex(conn)
+    dedup_index.backfill()
+
     total_inserted = 0
+    total_duplicates = 0
+    total_updated = 0
     for folder in os.listdir(CONTENT_DIR):
-        if not folder.startswith("fresh_"):
+        if folder.startswith(FRESH_PREFIX):
+            reextracted = False
+            category_name = folder[len(FRESH_PREFIX):].replace("_", "-")
+        elif folder.startswith(REEXTRACT_PREFIX):
+            reextracted = True
+            category_name = folder[len(REEXTRACT_PREFIX):].replace("_", "-")
+        else:
             continue
-        category_name = folder.replace("fresh_", "").replace("_", "-")
         category_index = category_map.get(category_name)
         if category_index is None:
             logging.warning(f"Category '{category_name}' not found in categories.csv, skip.")
@@ -152,13 +170,57 @@ def import_contents(conn, category_map):
             try:
                 with open(txt_path, "r", encoding="utf-8") as f:
                     text = f.read()
-                cursor.execute("""
-                    INSERT OR IGNORE INTO contents (category_index, publish_date, title, text)
-                    VALUES (?, ?, ?, ?)
-                """, (category_index, publish_date_str, title, text))
-                total_inserted += cursor.rowcount
 
-                shutil.copy2(txt_path, os.path.join(dest_folder, txt_file))
+                cursor.execute("""
+                    SELECT idx, text FROM contents WHERE category_index = ? AND publish_date = ? AND title = ?
+                """, (category_index, publish_date_str, title))
+                existing = cursor.fetchone()
+                changed = False
+                if existing is None:
+                    signature = minhash_signature(text)
+                    match = dedup_index.find_duplicate(signature) if signature is not None else None
+                    if match:
+                        canonical_idx, similarity = match
+                        total_duplicates += dedup_index.add_reference(
+                            canonical_idx, category_index, publish_date_str, title, similarity
+                        )
+                        logging.info(f"'{txt_file}' is a near-duplicate of content {canonical_idx} ({similarity:.2f})")
+                    else:
+                        cursor.execute("""
+                            INSERT OR IGNORE INTO contents (category_index, publish_date, title, text)
+                            VALUES (?, ?, ?, ?)
+                        """, (category_index, publish_date_str, title, text))
+                        total_inserted += cursor.rowcount
+                        if cursor.rowcount:
+                            dedup_index.add(cursor.lastrowid, signature)
+                    changed = True
+                elif (not is_missing_text(text) and text != existing[1]
+                      and (reextracted or is_missing_text(existing[1]))):
+                    # Re-extract (reextract_html.py) sau khi sửa extractor: thay mọi text khác đi;
+                    # crawl thường: chỉ sửa bài đang rỗng / "Content could not be extracted"
+                    signature = minhash_signature(text)
+                    match = dedup_index.find_duplicate(signature) if signature is not None else None
+                    if match and match[0] != existing[0]:
+                        canonical_idx, similarity = match
+                        total_duplicates += dedup_index.add_reference(
+                            canonical_idx, category_index, publish_date_str, title, similarity
+                        )
+                        cursor.execute("DELETE FROM contents WHERE idx = ?", (existing[0],))
+                        dedup_index.remove(existing[0])
+                        logging.info(f"Updated '{txt_file}' is a near-duplicate of content {canonical_idx}, "
+                                     f"deleted content {existing[0]} ({similarity:.2f})")
+                    else:
+                        cursor.execute("UPDATE contents SET text = ? WHERE idx = ?", (text, existing[0]))
+                        total_updated += 1
+                        # add() xóa signature/lsh_buckets cũ của bài trước khi index lại
+                        dedup_index.add(existing[0], signature)
+                    changed = True
+                elif reextracted and text != existing[1]:
+                    logging.warning(f"Re-extracted '{txt_file}' has no content, keep content {existing[0]} unchanged")
+
+                # Chỉ ghi đè bản trên đĩa khi DB cũng đổi, để file và contents.text luôn khớp
+                if changed:
+                    shutil.copy2(txt_path, os.path.join(dest_folder, txt_file))
 
             except Exception as e:
                 logging.error(f"Inserting file '{txt_file}': {e}")
@@ -167,21 +229,24 @@ def import_contents(conn, category_map):
         logging.info(f"Folder '{folder_path}' deleted")
 
     conn.commit()
-    logging.info(f"Contents import finished. Total inserted: {total_inserted}")
+    logging.info(f"Contents import finished. Total inserted: {total_inserted}, near-duplicates referenced: {total_duplicates}, updated: {total_updated}")
 
-def main():
-    category_map = load_category_index()
+def main(conn=None, category_rows=None):
+    category_map = load_category_index(category_rows)
     if not category_map:
         logging.error("No categories loaded, exiting.")
         return
 
-    conn = sqlite3.connect(DB_PATH)
+    own_conn = conn is None
+    if own_conn:
+        conn = sqlite3.connect(DB_PATH)
     try:
         import_links(conn)
         import_contents(conn, category_map)
     finally:
-        conn.close()
-        logging.info("Database connection closed.")
+        if own_conn:
+            conn.close()
+            logging.info("Database connection closed.")
 
 if __name__ == "__main__":
     main()
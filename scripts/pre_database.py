@@ -64,13 +64,15 @@ def dump_tables_info(conn):
 
     logging.info(f"Tables info exported to {TABLES_INFO_PATH}")
 
-def main():
-    if not os.path.exists(DB_PATH):
-        logging.error(f"Database not found: {DB_PATH}")
-        return
+def main(conn=None):
+    own_conn = conn is None
+    if own_conn:
+        if not os.path.exists(DB_PATH):
+            logging.error(f"Database not found: {DB_PATH}")
+            return
 
-    conn = sqlite3.connect(DB_PATH)
-    logging.info(f"Connected to database at {DB_PATH}")
+        conn = sqlite3.connect(DB_PATH)
+        logging.info(f"Connected to database at {DB_PATH}")
 
     # 1. Export categories table
     export_categories_to_csv(conn)
@@ -78,7 +80,8 @@ def main():
     # 2. Dump tables info
     dump_tables_info(conn)
 
-    conn.close()
+    if own_conn:
+        conn.close()
     logging.info("Database export and tables info dump completed")
 
 if __name__ == "__main__":
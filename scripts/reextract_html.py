@@ -0,0 +1,73 @@
+import os
+import sys
+import time
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.abspath(os.path.join(BASE_DIR, '..'))
+CONTENT_DIR = "content_data"
+LOG_PATH = os.path.join("logs", "reextract_html_log.txt")
+MAX_WORKERS = os.cpu_count() or 1
+
+# Giống content_processing: đường dẫn tương đối theo thư mục gốc project
+os.chdir(ROOT_DIR)
+os.makedirs("logs", exist_ok=True)
+
+# Setup logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler(LOG_PATH, mode='a', encoding='utf-8'),
+        logging.StreamHandler()
+    ]
+)
+
+from html_archive import HtmlArchive, read_record
+from content_processing import save_txt_from_html
+
+def reextract_page(url, category_name, segment, offset, length):
+    try:
+        html_content = read_record(segment, offset, length)
+        output_dir = os.path.join(CONTENT_DIR, f"reextract_{category_name}")
+        os.makedirs(output_dir, exist_ok=True)
+        filename = save_txt_from_html(html_content, output_dir, url)
+        return True, filename
+    except Exception as e:
+        return False, f"{url} error: {e}"
+
+def main():
+    """Re-run save_txt_from_html on archived pages (no network). Optional args: category names to limit to."""
+    categories = sys.argv[1:]
+    archive = HtmlArchive()
+    try:
+        captures = [row for row in archive.latest_captures(categories) if row[1]]
+    finally:
+        archive.close()
+
+    if not captures:
+        logging.info("No archived pages to re-extract.")
+        return
+
+    logging.info(f"Re-extracting {len(captures)} archived pages with {MAX_WORKERS} processes")
+    start_time = time.time()
+    success_count = 0
+    fail_count = 0
+
+    with ProcessPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = [executor.submit(reextract_page, *capture) for capture in captures]
+        for future in as_completed(futures):
+            success, info = future.result()
+            if success:
+                success_count += 1
+            else:
+                logging.warning(f"[FAIL] {info}")
+                fail_count += 1
+
+    elapsed = time.time() - start_time
+    logging.info(f"Re-extract finished. Success: {success_count}, Fail: {fail_count}, Time: {elapsed:.2f}s")
+    logging.info("Run post_database.py to import the re-extracted contents.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+import os
+import sys
+import csv
+import time
+import sqlite3
+import logging
+import threading
+import importlib
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+# Paths
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.abspath(os.path.join(BASE_DIR, '..'))
+DB_PATH = os.path.join(ROOT_DIR, 'database', 'vneconomy_news.db')
+CATEGORIES_CSV = os.path.join(ROOT_DIR, 'tmp', 'categories.csv')
+FRESH_DIR = os.path.join(ROOT_DIR, 'tmp', 'fresh_links')
+LOG_PATH = os.path.join(ROOT_DIR, 'logs', 'run_log.txt')
+MAX_BROWSERS = 20  # tổng số Chromium mở cùng lúc khi pages và content chạy chồng nhau
+CRAWL_SHARED_IMPORTS = ("playwright.sync_api", "bs4")
+
+# Các script dùng đường dẫn tương đối theo thư mục gốc project
+os.chdir(ROOT_DIR)
+sys.path.insert(0, BASE_DIR)
+os.makedirs(os.path.join(ROOT_DIR, 'logs'), exist_ok=True)
+
+# Setup logging (một lần cho cả pipeline, các stage dùng chung root logger)
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler(LOG_PATH, mode='a', encoding='utf-8'),
+        logging.StreamHandler()
+    ]
+)
+
+stage_timings = []
+
+def load_stage(name):
+    """Import a stage module lazily; heavy dependencies are only loaded when the stage starts"""
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    return module, time.perf_counter() - start
+
+class ThreadPrefixFilter(logging.Filter):
+    """Keep only records logged from threads whose name starts with one of the prefixes"""
+
+    def __init__(self, prefixes):
+        super().__init__()
+        self.prefixes = tuple(prefixes)
+
+    def filter(self, record):
+        return record.threadName.startswith(self.prefixes)
+
+@contextmanager
+def stage_log(module, thread_prefixes=None):
+    """Also write to the stage's own log file while it is running.
+
+    thread_prefixes is needed when stages overlap, so each log file only gets its own stage's lines.
+    """
+    root = logging.getLogger()
+    handler = logging.FileHandler(module.LOG_PATH, mode='a', encoding='utf-8')
+    handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+    if thread_prefixes:
+        handler.addFilter(ThreadPrefixFilter(thread_prefixes))
+    root.addHandler(handler)
+    try:
+        yield
+    finally:
+        root.removeHandler(handler)
+        handler.close()
+
+def record_timing(stage, startup, elapsed):
+    stage_timings.append((stage, startup, elapsed))
+    logging.info(f"[{stage}] startup {startup:.2f}s, run {elapsed:.2f}s")
+
+def load_category_rows():
+    if not os.path.exists(CATEGORIES_CSV):
+        logging.error(f"Categories CSV '{CATEGORIES_CSV}' not found")
+        return []
+    with open(CATEGORIES_CSV, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+def run_pre_database(conn):
+    pre_database, startup = load_stage("pre_database")
+    start = time.perf_counter()
+    with stage_log(pre_database):
+        pre_database.main(conn)
+    record_timing("pre_database", startup, time.perf_counter() - start)
+
+def run_crawl(category_rows):
+    """Crawl pages and contents; a category's contents start as soon as its links are ready"""
+    # Playwright/BeautifulSoup dùng chung cho cả hai stage, đo riêng để startup của từng stage không lệch
+    shared_startup = sum(load_stage(name)[1] for name in CRAWL_SHARED_IMPORTS)
+    record_timing("crawl shared imports", shared_startup, 0.0)
+    pages_processing, pages_startup = load_stage("pages_processing")
+    content_processing, content_startup = load_stage("content_processing")
+
+    # Mỗi category của pages giữ 1 Chromium, mỗi bài của content mở 1 Chromium: giới hạn tổng chung
+    browser_slots = threading.BoundedSemaphore(MAX_BROWSERS)
+    pages_processing.browser_slots = browser_slots
+    content_processing.browser_slots = browser_slots
+
+    content_durations = []
+
+    def process_content_category(csv_file):
+        category_start = time.perf_counter()
+        try:
+            content_processing.process_category(csv_file)
+        except Exception as e:
+            logging.error(f"Error processing contents for '{csv_file}': {e}")
+        content_durations.append(time.perf_counter() - category_start)
+
+    submitted = set()
+    start = time.perf_counter()
+    # pages chạy ở MainThread + thread "pages*", content ở thread "content*"
+    with stage_log(pages_processing, ("MainThread", "pages")), stage_log(content_processing, ("content",)):
+        # Một worker: mỗi category đã tự chạy MAX_THREADS trình duyệt song song
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="content") as content_executor:
+            def on_category_done(csv_file):
+                submitted.add(csv_file)
+                content_executor.submit(process_content_category, csv_file)
+
+            pages_processing.main(category_rows, on_category_done=on_category_done)
+            record_timing("pages_processing", pages_startup, time.perf_counter() - start)
+
+            # CSV còn sót lại từ lần chạy trước
+            if os.path.exists(FRESH_DIR):
+                for csv_file in sorted(os.listdir(FRESH_DIR)):
+                    if csv_file.endswith(".csv") and csv_file not in submitted:
+                        content_executor.submit(process_content_category, csv_file)
+    # Thời gian thực sự xử lý content (chạy chồng lên pages nên không lấy wall time từ start)
+    record_timing("content_processing", content_startup, sum(content_durations))
+    logging.info(f"[crawl] pages + content wall time {time.perf_counter() - start:.2f}s")
+
+def run_post_database(conn, category_rows):
+    post_database, startup = load_stage("post_database")
+    start = time.perf_counter()
+    with stage_log(post_database):
+        post_database.main(conn, category_rows)
+    record_timing("post_database", startup, time.perf_counter() - start)
+
+def main():
+    pipeline_start = time.perf_counter()
+
+    if not os.path.exists(DB_PATH):
+        logging.error(f"Database not found: {DB_PATH}")
+        return
+
+    conn = sqlite3.connect(DB_PATH)
+    logging.info(f"Connected to database at {DB_PATH}")
+    try:
+        run_pre_database(conn)
+
+        category_rows = load_category_rows()
+        if not category_rows:
+            logging.error("No categories loaded, exiting.")
+            return
+        logging.info(f"Loaded {len(category_rows)} categories from CSV")
+
+        run_crawl(category_rows)
+        run_post_database(conn, category_rows)
+    except Exception:
+        logging.exception("Pipeline failed")
+        sys.exit(1)
+    finally:
+        conn.close()
+        logging.info("Database connection closed.")
+
+    logging.info("Stage timings (startup = import time of the stage module, shared crawl imports listed separately):")
+    for stage, startup, elapsed in stage_timings:
+        logging.info(f"  {stage:<20} startup {startup:6.2f}s | run {elapsed:8.2f}s")
+    logging.info(f"Pipeline finished in {time.perf_counter() - pipeline_start:.2f}s")
+
+if __name__ == "__main__":
+    main()